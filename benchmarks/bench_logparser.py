@@ -0,0 +1,136 @@
+"""Compare the throughput of the log parsers.
+
+The legacy parser reads the log into str lines and tokenizes them with
+`str.split()` on every query, while `fs_crashplanfs.logparser` scans
+the memory-mapped log once, into an index of the offsets of its records
+sorted by path. Both are timed separately on loading the log and on querying
+it for the paths under a prefix, as `CrashPlanFS` loads the log once and then
+queries it for every `getinfo` and `listdir` call. Both queries return
+undecoded paths on Python 2. Each parser runs in a process of its own, which
+reports its peak RSS after loading the log, and after the queries, including
+the pages of the log it mapped.
+
+Usage: python benchmarks/bench_logparser.py [log_file] [--prefix PREFIX ...]
+
+Without a log file, the bundled test log is replicated into a temporary
+file of about 100 MB.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir, 'src'))
+
+from fs_crashplanfs.logparser import (CrashPlanLogIndex, encode_path,
+                                      open_log_file)
+
+SAMPLE_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          os.pardir, 'tests', 'data',
+                          'crashplan_backup_files.log')
+
+
+def legacy_load(log_file):
+    with open(log_file, 'r') as f:
+        return f.readlines()
+
+
+def legacy_query(lines, prefix):
+    return [l.split()[6] for l in lines if prefix in l and l.startswith('I ')
+                                        and len(l.split()) > 6
+                                        and len(l.split()[4]) == 32
+                                        and l.split()[6].startswith(prefix)]
+
+
+def index_load(log_file):
+    return CrashPlanLogIndex(open_log_file(log_file))
+
+
+def index_query(index, prefix):
+    return [r.raw_path for r in index.find(encode_path(prefix))]
+
+
+PARSERS = (('legacy', legacy_load, legacy_query),
+           ('index', index_load, index_query))
+
+DEFAULT_PREFIXES = ['/my/crashplan/backups/vms',
+                    '/my/crashplan/backups/vms/gabarolas/'
+                    'gabarolas-2018-08-02_16-07-17/']
+
+
+def make_sample_log(copies):
+    fd, path = tempfile.mkstemp(suffix='.log')
+    with os.fdopen(fd, 'wb') as out:
+        for _ in range(copies):
+            with open(SAMPLE_LOG, 'rb') as f:
+                shutil.copyfileobj(f, out)
+    return path
+
+
+def peak_rss():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+
+def run_parser(name, log_file, prefixes, repeat):
+    load, query = dict((n, (l, q)) for n, l, q in PARSERS)[name]
+    size_mb = os.path.getsize(log_file) / float(1 << 20)
+    load_time = min(timeit.repeat(lambda: load(log_file),
+                                  repeat=repeat, number=1))
+    data = load(log_file)
+    load_rss = peak_rss()
+    row = '{:>8} {:12.1f}'.format(name, size_mb / load_time)
+    for prefix in prefixes:
+        query_time = min(timeit.repeat(lambda: query(data, prefix),
+                                       repeat=repeat, number=1))
+        row += '{:12.1f}'.format(size_mb / query_time)
+    print(row + '{:14.1f}{:14.1f}'.format(load_rss, peak_rss()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('log_file', nargs='?')
+    parser.add_argument('--prefix', action='append', dest='prefixes',
+                        help='path prefix to query, may be repeated')
+    parser.add_argument('--copies', type=int, default=100,
+                        help='copies of the sample log to benchmark against')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--parser', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    prefixes = args.prefixes or DEFAULT_PREFIXES
+
+    if args.parser:
+        run_parser(args.parser, args.log_file, prefixes, args.repeat)
+        return
+
+    log_file = args.log_file or make_sample_log(args.copies)
+    try:
+        size_mb = os.path.getsize(log_file) / float(1 << 20)
+        print('{}: {:.1f} MB'.format(log_file, size_mb))
+        for i, prefix in enumerate(prefixes):
+            print('query {}: {}'.format(i, prefix))
+        print('{:>8} {:>12}'.format('', 'load MB/s') +
+              ''.join('{:>12}'.format('query {}'.format(i))
+                      for i in range(len(prefixes))) +
+              '{:>14}{:>14}'.format('load RSS MB', 'peak RSS MB'))
+        sys.stdout.flush()
+        for name, _, _ in PARSERS:
+            command = [sys.executable, os.path.abspath(__file__), log_file,
+                       '--parser', name, '--repeat', str(args.repeat)]
+            for prefix in prefixes:
+                command.extend(['--prefix', prefix])
+            subprocess.check_call(command)
+    finally:
+        if not args.log_file:
+            os.remove(log_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,9 @@ from fs.info import Info
 from fs.subfs import SubFS
 from fs.permissions import Permissions
 
+from fs_crashplanfs.logparser import (CrashPlanLogIndex, decode_path,
+                                      encode_path, open_log_file)
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_CRASHPLAN_LOG_PATH = '/usr/local/crashplan/log'
@@ -83,24 +86,30 @@ class CrashPlanLog:
         else:
             self._log_files = glob.glob(os.path.join(log_path, 'backup_files.log.*'))
 
-        lines = []
+        # The logs stay mapped for the records to refer to, until close()
+        self._logs = []
+        self._indexes = []
         for log_file in self._log_files:
-            with open(log_file, 'r') as f:
-                lines.extend(f.readlines())
-        self._lines = lines
-
-    def getLines(self):
-        return self._lines
+            log = open_log_file(log_file)
+            if log is not None:
+                self._logs.append(log)
+                self._indexes.append(CrashPlanLogIndex(log))
         
-    def getLinesFor(self, s):
-        res = [l for l in self.getLines() if s in l and l.startswith('I ')
-                                                    and len(l.split()) > 6
-                                                    and len(l.split()[4]) == 32
-                                                    and l.split()[6].startswith(s)]
+    def getRecordsFor(self, s):
+        prefix = encode_path(s)
+        res = []
+        for index in self._indexes:
+            res.extend(index.find(prefix))
         return res
         
     def getLogFiles(self):
         return self._log_files
+
+    def close(self):
+        self._indexes = []
+        for log in self._logs:
+            log.close()
+        self._logs = []
         
 class CrashPlanFS(FS):
     
@@ -153,20 +162,21 @@ class CrashPlanFS(FS):
     def _getinfo_remote(self, path, namespaces):
         _path = self._get_prefixed_path(path)
         
-        resource_lines = self._data_provider.getLinesFor(_path)
-        if len(resource_lines) == 0:
+        resource_records = self._data_provider.getRecordsFor(_path)
+        if len(resource_records) == 0:
             raise fs.errors.ResourceNotFound(path)
         
         # check if it is an exact match
-        exact_matches = [r for r in resource_lines if r.split()[6] == _path]
+        raw_path = encode_path(_path)
+        exact_matches = [r for r in resource_records if r.raw_path == raw_path]
         
         if len(exact_matches) == 0:
             # It's an intermediate directory, without a dedicated log entry
-            entry = resource_lines[-1]
+            entry = resource_records[-1]
             is_dir = True
         else: # get the most recent entry for the resource
             entry = exact_matches[-1]
-            is_dir = int(entry.split()[5]) == 1
+            is_dir = entry.is_dir
         
         raw_info = {}
         
@@ -180,8 +190,7 @@ class CrashPlanFS(FS):
         if 'details' in namespaces:
             details = {}
             raw_info['details'] = details
-            date_str = ' '.join(entry.split()[1:3])
-            date_obj = datetime.strptime(date_str, '%m/%d/%y %I:%M%p')
+            date_obj = datetime.strptime(entry.timestamp, '%m/%d/%y %I:%M%p')
             epoch_time = (date_obj - datetime(1970, 1, 1)).total_seconds()
             details['modified'] = epoch_time
             details['type'] = int(ResourceType.directory if basic['is_dir']
@@ -261,12 +270,14 @@ class CrashPlanFS(FS):
         if self._show_local and self._has_local_version(path):
             local_path_entries = self._transfer_area.listdir(self._get_local_path(path))
         
-        entries = [line.split() for line in self._data_provider.getLinesFor(_path)]
-        remote_path_entries = set()
-        for e in entries:
-            if fs.path.isparent(_path, e[6]):
-                suffix = fs.path.frombase(fs.path.forcedir(_path), e[6]).split('/')[0]
-                if suffix: remote_path_entries.add(suffix)
+        dir_path = fs.path.forcedir(_path)
+        records = self._data_provider.getRecordsFor(dir_path)
+        raw_dir_path = encode_path(dir_path)
+        raw_entries = set()
+        for r in records:
+            suffix = r.raw_path[len(raw_dir_path):].split(b'/')[0]
+            if suffix: raw_entries.add(suffix)
+        remote_path_entries = set(decode_path(e) for e in raw_entries)
         
         return list(remote_path_entries.union(local_path_entries))
 
@@ -359,6 +370,10 @@ class CrashPlanFS(FS):
                 self._get_prefixed_path(_path), self._data_provider.getLogFiles()[0])
         else:
             raise fs.errors.NoURL(path, purpose)
+
+    def close(self):
+        self._data_provider.close()
+        super(CrashPlanFS, self).close()
     
     def _collect_garbage(self):
         
@@ -0,0 +1,216 @@
+from array import array
+import heapq
+import mmap
+import re
+
+# A backup record looks like:
+#
+#   I 07/24/18 03:54AM 42 <md5> 0 /some/path with spaces (3169) [0,1,0,0,0,0,0]
+#
+# The path is everything between the directory flag and an optional
+# "(size) [stats]" suffix, so it may contain spaces. The stats may be missing
+# after the size of a file, and deleted files carry "(deleted)" instead of a
+# size. Directories only carry the full "(size) [stats]" suffix, so that a
+# directory named "Holiday (2019)" keeps its name.
+#
+# The record regex starts with the "I " literal, so the regex engine skips to
+# its occurrences, and only then checks that it starts a line. The path then
+# extends over every space that does not start the suffix. Files and
+# directories get a branch each without groups of their own, as Python 2 does
+# not reset groups set by failed branches.
+_FILE_SPACE = br' (?!\((?:\d+|deleted)\)(?: \[[\d,]*\])?\r?$)'
+_DIR_SPACE = br' (?!\((?:\d+|deleted)\) \[[\d,]*\]\r?$)'
+
+_RECORD_RE = re.compile(
+    br'I (?<=^I )\d\d/\d\d/\d\d \d\d:\d\d[AP]M \d+ [0-9a-f]{32} ([01]) '
+    br'(?:(?<=0 )[^ \r\n]*(?:' + _FILE_SPACE + br'[^ \r\n]*)*'
+    br'|(?<=1 )[^ \r\n]*(?:' + _DIR_SPACE + br'[^ \r\n]*)*)',
+    re.MULTILINE)
+_SUFFIX_RE = re.compile(br' \((\d+|deleted)\)(?: \[([\d,]*)\])?\r?$',
+                        re.MULTILINE)
+
+# Records are sorted by path in runs of this many, which are then merged, so
+# that only the paths of a single run are copied out of the log at a time
+_SORT_RUN = 1 << 16
+
+PATH_ENCODING = 'utf-8'
+
+
+def encode_path(path):
+    return path.encode(PATH_ENCODING) if isinstance(path, type(u'')) else path
+
+
+def decode_path(raw_path):
+    return raw_path.decode(PATH_ENCODING, 'replace')
+
+
+class CrashPlanLogRecord(object):
+    """A single file or directory entry of a CrashPlan backup log.
+
+    Records refer to their line in the log data by offsets, and only parse
+    the fields, and decode the path, on first access.
+    """
+
+    # The path and suffix slots are only filled on first access
+    __slots__ = ('_data', '_start', '_path_start', '_path_end', '_path',
+                 '_suffix')
+
+    def __init__(self, data, start, path_start, path_end):
+        self._data = data
+        self._start = start
+        self._path_start = path_start
+        self._path_end = path_end
+
+    def _get_header(self):
+        # e.g. "I 07/24/18 03:54AM 42 <md5> 0"
+        return self._data[self._start:self._path_start - 1]
+
+    def _get_suffix(self):
+        try:
+            return self._suffix
+        except AttributeError:
+            match = _SUFFIX_RE.match(self._data, self._path_end)
+            self._suffix = match.groups() if match else (None, None)
+            return self._suffix
+
+    @property
+    def timestamp(self):
+        """The record date and time, e.g. ``'07/24/18 03:54AM'``."""
+        return self._get_header()[2:18].decode('ascii')
+
+    @property
+    def thread_id(self):
+        return int(self._get_header()[19:-35])
+
+    @property
+    def md5(self):
+        return self._get_header()[-34:-2].decode('ascii')
+
+    @property
+    def is_dir(self):
+        return self._get_header()[-1:] == b'1'
+
+    @property
+    def raw_path(self):
+        return self._data[self._path_start:self._path_end]
+
+    @property
+    def path(self):
+        try:
+            return self._path
+        except AttributeError:
+            self._path = decode_path(self.raw_path)
+            return self._path
+
+    @property
+    def size(self):
+        size = self._get_suffix()[0]
+        if size is None or size == b'deleted':
+            return None
+        return int(size)
+
+    @property
+    def deleted(self):
+        return self._get_suffix()[0] == b'deleted'
+
+    @property
+    def stats(self):
+        stats = self._get_suffix()[1]
+        if stats is None:
+            return None
+        return [int(s) for s in stats.split(b',') if s]
+
+    def __repr__(self):
+        return '<CrashPlanLogRecord {!r}>'.format(self.path)
+
+
+def _prefix_end(prefix):
+    # The smallest bytes after all those starting with `prefix`, if any
+    prefix = bytearray(prefix.rstrip(b'\xff'))
+    if not prefix:
+        return None
+    prefix[-1] += 1
+    return bytes(prefix)
+
+
+def _iter_paths(data, path_starts, path_ends, ids):
+    return ((data[path_starts[i]:path_ends[i]], i) for i in ids)
+
+
+class CrashPlanLogIndex(object):
+    """The records of a backup log, sorted by their raw path.
+
+    CrashPlanFS queries a log for every path it visits, so the log is scanned
+    once, and each record is kept as the offsets of its line and path in
+    `data`, which may be any bytes-like buffer, including an `mmap` object.
+    `data` must stay open as long as the index and its records are used.
+    Queries return the records in log order, so that the most recent record
+    of a path comes last.
+    """
+
+    def __init__(self, data):
+        self._data = data
+        starts, path_starts, path_ends = array('l'), array('l'), array('l')
+        add_start, add_path_start, add_path_end = (
+            starts.append, path_starts.append, path_ends.append)
+        for match in _RECORD_RE.finditer(data):
+            add_start(match.start())
+            add_path_start(match.end(1) + 1)
+            add_path_end(match.end())
+        self._starts = starts
+        self._path_starts = path_starts
+        self._path_ends = path_ends
+        self._order = self._sort_by_path(len(starts))
+
+    def _get_path(self, i):
+        return self._data[self._path_starts[i]:self._path_ends[i]]
+
+    def _sort_by_path(self, size):
+        data, path_starts, path_ends = (
+            self._data, self._path_starts, self._path_ends)
+        runs = []
+        for lo in range(0, size, _SORT_RUN):
+            ids = range(lo, min(lo + _SORT_RUN, size))
+            paths = [data[path_starts[i]:path_ends[i]] for i in ids]
+            runs.append(array('l', sorted(ids, key=lambda i: paths[i - lo])))
+        if len(runs) <= 1:
+            return runs[0] if runs else array('l')
+        # Ties between equal paths are broken by their position in the log
+        merged = heapq.merge(*[_iter_paths(data, path_starts, path_ends, run)
+                               for run in runs])
+        return array('l', (i for _, i in merged))
+
+    def _bisect(self, path, lo=0):
+        # The position of the first record in path order not before `path`
+        order, hi = self._order, len(self._order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._get_path(order[mid]) < path:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, prefix=b''):
+        """Return the records whose path starts with the bytes `prefix`."""
+        lo = self._bisect(prefix)
+        end = _prefix_end(prefix)
+        hi = len(self._order) if end is None else self._bisect(end, lo)
+        data = self._data
+        starts, path_starts, path_ends = (
+            self._starts, self._path_starts, self._path_ends)
+        return [CrashPlanLogRecord(data, starts[i], path_starts[i],
+                                   path_ends[i])
+                for i in sorted(self._order[lo:hi])]
+
+
+def open_log_file(log_file):
+    """Memory-map a backup log file for `CrashPlanLogIndex`.
+
+    Returns None for an empty file, which cannot be memory-mapped.
+    """
+    with open(log_file, 'rb') as f:
+        f.seek(0, 2)
+        if f.tell() == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
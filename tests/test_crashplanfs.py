@@ -125,7 +125,24 @@ class TestCrashPlanFS(FSTestCases, unittest.TestCase, TestUtils):
                 assert not fs.exists(new_file)
                 fs.touch(new_file)
                 assert not transfer_area.exists(new_file)
-        
+
+    def test_paths_with_spaces(self):
+        log_file = self.get_resource('crashplan_spaces.log')
+        fs = CrashPlanFS(log_file=log_file.strpath)
+
+        assert set(fs.listdir('/my/crashplan')) == set(['My Documents',
+                                                        'plain.txt'])
+        assert set(fs.listdir('/my/crashplan/My Documents')) == set(
+            ['tax return 2017.pdf', 'notes (draft) [v2].txt', 'Holiday (2019)'])
+        assert fs.isdir('/my/crashplan/My Documents')
+        assert fs.isdir('/my/crashplan/My Documents/Holiday (2019)')
+        assert not fs.exists('/my/crashplan/plain.txt ')
+        assert fs.isfile('/my/crashplan/My Documents/tax return 2017.pdf')
+
+        modified = fs.getinfo('/my/crashplan/My Documents/notes (draft) [v2].txt',
+                              namespaces=['details']).modified
+        assert modified == datetime(2018, 7, 24, 15, 55, tzinfo=pytz.UTC)
+
 class TestCrashPlanFSSubDir(FSTestCases, unittest.TestCase, TestUtils):
     
     def make_fs(self):
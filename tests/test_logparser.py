@@ -0,0 +1,179 @@
+import unittest
+
+from fs_crashplanfs import logparser
+from fs_crashplanfs.crashplan import CrashPlanLog
+from fs_crashplanfs.logparser import CrashPlanLogIndex
+
+from test_utils import TestUtils
+
+class TestLogParser(unittest.TestCase, TestUtils):
+
+    def test_parse_records(self):
+        log_file = self.get_resource('crashplan_spaces.log')
+        log = CrashPlanLog(log_file=log_file.strpath)
+        try:
+            records = log.getRecordsFor(u'/')
+
+            # Lines that are not backup records are skipped
+            assert [r.path for r in records] == [
+                u'/my/crashplan/My Documents',
+                u'/my/crashplan/My Documents/tax return 2017.pdf',
+                u'/my/crashplan/My Documents/notes (draft) [v2].txt',
+                u'/my/crashplan/My Documents/Holiday (2019)',
+                u'/my/crashplan/plain.txt']
+
+            directory = records[0]
+            assert directory.is_dir
+            assert directory.size is None
+            assert directory.stats is None
+            assert directory.md5 == '63e99366a3970f6f2b650f41e12c75bf'
+
+            f = records[2]
+            assert not f.is_dir
+            assert f.size == 3169
+            assert f.stats == [0, 1, 0, 0, 0, 0, 0]
+            assert f.thread_id == 42
+            assert f.timestamp == u'07/24/18 03:55PM'
+        finally:
+            log.close()
+
+    def test_parse_empty_log(self):
+        log_file = self.get_resource('crashplan_empty.log')
+        log = CrashPlanLog(log_file=log_file.strpath)
+        try:
+            assert log.getRecordsFor(u'/') == []
+        finally:
+            log.close()
+
+    def test_crlf_line_endings(self):
+        data = (b'I 07/24/18 03:54AM 42 84aedf61ce9d02cf30560d3da447707b 0 '
+                b'/a b/c (30) [0,1]\r\n'
+                b'I 07/24/18 03:54AM 42 63e99366a3970f6f2b650f41e12c75bf 1 '
+                b'/a b\r\n')
+        records = CrashPlanLogIndex(data).find()
+        assert [r.path for r in records] == [u'/a b/c', u'/a b']
+        assert records[0].size == 30
+
+    def test_optional_suffixes(self):
+        data = (b'I 07/24/18 03:54AM 42 84aedf61ce9d02cf30560d3da447707b 0 '
+                b'/a b/sized (2212587520)\n'
+                b'I 07/24/18 03:54AM 42 63e99366a3970f6f2b650f41e12c75bf 0 '
+                b'/a b/gone (deleted)\n')
+        sized, gone = CrashPlanLogIndex(data).find()
+        assert sized.path == u'/a b/sized'
+        assert sized.size == 2212587520
+        assert sized.stats is None
+        assert not sized.deleted
+        assert gone.path == u'/a b/gone'
+        assert gone.size is None
+        assert gone.deleted
+
+    def test_directory_suffix(self):
+        data = (b'I 07/24/18 03:54AM 42 84aedf61ce9d02cf30560d3da447707b 1 '
+                b'/pics/Holiday (2019)\n'
+                b'I 07/24/18 03:54AM 42 63e99366a3970f6f2b650f41e12c75bf 1 '
+                b'/pics/empty (0) [933,3153]\n')
+        index = CrashPlanLogIndex(data)
+        holiday, empty = index.find(b'/pics')
+        # Directories only carry a size along with the stats
+        assert holiday.path == u'/pics/Holiday (2019)'
+        assert holiday.size is None
+        assert empty.path == u'/pics/empty'
+        assert empty.size == 0
+        assert empty.stats == [933, 3153]
+        assert [r.path for r in index.find(b'/pics/Holiday ')] == [
+            u'/pics/Holiday (2019)']
+
+    def test_find(self):
+        data = (b'I 07/24/18 03:54AM 42 84aedf61ce9d02cf30560d3da447707b 0 '
+                b'/b/c (30) [0]\n'
+                b'I 07/24/18 03:54AM 42 63e99366a3970f6f2b650f41e12c75bf 0 '
+                b'/a\xff/c (30) [0]\n'
+                b'I 07/24/18 03:55AM 42 84aedf61ce9d02cf30560d3da447707b 0 '
+                b'/a (30) [0]\n'
+                b'I 07/24/18 03:56AM 42 84aedf61ce9d02cf30560d3da447707b 0 '
+                b'/b/c (31) [0]\n'
+                b'I 07/24/18 03:57AM 42 84aedf61ce9d02cf30560d3da447707b 0 '
+                b'/b (31) [0]\n')
+        index = CrashPlanLogIndex(data)
+
+        def paths(prefix):
+            return [r.raw_path for r in index.find(prefix)]
+
+        # Records are returned in log order
+        assert paths(b'') == [b'/b/c', b'/a\xff/c', b'/a', b'/b/c', b'/b']
+        assert [r.size for r in index.find(b'/b/c')] == [30, 31]
+        assert paths(b'/a') == [b'/a\xff/c', b'/a']
+        assert paths(b'/a\xff') == [b'/a\xff/c']
+        assert paths(b'/b/') == [b'/b/c', b'/b/c']
+        assert paths(b'/c') == []
+        assert CrashPlanLogIndex(b'').find(b'/') == []
+
+    def test_find_merges_sorted_runs(self):
+        log_file = self.get_resource('crashplan_backup_files.log')
+        with open(log_file.strpath, 'rb') as f:
+            data = f.read()
+        expected = [r.raw_path for r in CrashPlanLogIndex(data).find()]
+
+        sort_run = logparser._SORT_RUN
+        logparser._SORT_RUN = 100
+        try:
+            index = CrashPlanLogIndex(data)
+        finally:
+            logparser._SORT_RUN = sort_run
+        assert [r.raw_path for r in index.find()] == expected
+        assert len(index.find(b'/my/crashplan/backups/vms/')) > 0
+        assert ([r.raw_path for r in index.find(b'/my/crashplan/backups/vms/')]
+                == [p for p in expected
+                    if p.startswith(b'/my/crashplan/backups/vms/')])
+
+    def test_find_with_spaces(self):
+        data = (b'I 07/24/18 03:54AM 42 84aedf61ce9d02cf30560d3da447707b 0 '
+                b'/a b/c (30) [0]\n'
+                b'I 07/24/18 03:54AM 42 63e99366a3970f6f2b650f41e12c75bf 0 '
+                b'/a b/c (30) (12) [0]\n'
+                b'I 07/24/18 03:54AM 42 [mittens Backup Set] /a b/c\n'
+                b'I 07/24/18 03:54AM 42 63e99366a3970f6f2b650f41e12c75bf 0 '
+                b'/x/caf\xc3\xa9 (12) [0]\n')
+        index = CrashPlanLogIndex(data)
+
+        def paths(prefix):
+            return [r.path for r in index.find(prefix)]
+
+        assert paths(b'/a b') == [u'/a b/c', u'/a b/c (30)']
+        assert paths(b'/a c') == []
+        assert paths(b'0 /a b') == []
+        assert paths(b'/x/') == [u'/x/caf\xe9']
+        # The prefix must not run into the suffix of a record
+        assert paths(b'/a b/c (30)') == [u'/a b/c (30)']
+        assert paths(b'/a b/c ') == [u'/a b/c (30)']
+        assert paths(b'/x/caf\xc3\xa9 ') == []
+
+    def test_undecodable_paths_are_only_decoded_when_kept(self):
+        data = (b'I 07/24/18 03:54AM 42 84aedf61ce9d02cf30560d3da447707b 0 '
+                b'/a/\xff (30) [0]\n'
+                b'I 07/24/18 03:54AM 42 63e99366a3970f6f2b650f41e12c75bf 0 '
+                b'/b/c (30) [0]\n')
+        index = CrashPlanLogIndex(data)
+        record, = index.find(b'/b')
+        assert record.path == u'/b/c'
+        record, = index.find(b'/a')
+        assert record.raw_path == b'/a/\xff'
+        assert record.path == u'/a/\ufffd'
+
+    def test_many_records(self):
+        line = (b'I 07/24/18 03:54AM 42 84aedf61ce9d02cf30560d3da447707b 0 '
+                b'/a/b (30) [0,1,0,0,0,0,0]\n')
+        index = CrashPlanLogIndex(line * 10000)
+        records = index.find(b'/a/b')
+        assert len(records) == 10000
+        assert set(r.path for r in records) == set([u'/a/b'])
+
+    def test_file_after_directory_with_spaces(self):
+        data = (b'I 07/24/18 03:54AM 42 84aedf61ce9d02cf30560d3da447707b 1 '
+                b'/a b\n'
+                b'I 07/24/18 03:54AM 42 63e99366a3970f6f2b650f41e12c75bf 0 '
+                b'/a b/c d (30) [0]\n')
+        record, = CrashPlanLogIndex(data).find(b'/a b/c')
+        assert record.path == u'/a b/c d'
+        assert not record.is_dir